@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+임베딩 검색 설정 (CLI, Streamlit 버전 공용)
+
+두 앱이 같은 ChromaDB 인덱스를 같은 형식의 쿼리로 검색하도록 한 곳에서 정의
+"""
+
+# multilingual-e5-large-instruct는 검색 쿼리에 지시문 접두어가 필요 (문서는 접두어 없음)
+QUERY_PREFIX = "Instruct: Given a Korean news article, retrieve similar press ethics review cases\nQuery: "
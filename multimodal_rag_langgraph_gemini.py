@@ -3,22 +3,40 @@
 LangGraph 기반 뉴스 심의문 분석 시스템 (Gemini 2.0 Flash 버전)
 단계: 기사추출 → 이미지처리 → 유사사례검색 → 심의문생성 → 검토
 """
+import asyncio
+import hashlib
+import json
+import logging
 import os
 import re
-from typing import TypedDict
+import sys
+from functools import lru_cache
+from typing import Iterator, Optional, TypedDict
 from langgraph.graph import StateGraph, END
-import google.generativeai as genai
+from google import genai
+from google.genai import types
 from dotenv import load_dotenv
 import chromadb
+import torch
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from chromadb.utils.embedding_functions import EmbeddingFunction
 from news_text_scraper import extract_article
-import base64
+from embedding_config import QUERY_PREFIX
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image
 from io import BytesIO
 
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 # ========== 환경 변수 로드 ==========
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_KEY")
@@ -26,34 +44,130 @@ if not GEMINI_API_KEY:
     raise ValueError("GEMINI_KEY가 .env 파일에 설정되지 않았습니다.")
 
 # ========== Gemini 설정 ==========
-genai.configure(api_key=GEMINI_API_KEY)
+# 프로세스 전체에서 하나의 클라이언트(HTTP 연결)를 공유
+gemini_client = genai.Client(api_key=GEMINI_API_KEY)
 MODEL_NAME = 'gemini-2.0-flash'
 CHROMA_PATH = "./chroma/"
 COLLECTION_NAME = "press_ethics_e5_072025"
+MAX_IMAGE_SIZE = (1024, 1024)  # Gemini 전송 전 이미지 최대 크기 (긴 변 기준)
+JPEG_PASSTHROUGH_MAX_BYTES = 1_500_000  # 이 크기 미만이고 해상도가 MAX_IMAGE_SIZE 이내인 JPEG는 재인코딩 없이 그대로 전송
+
+# ========== 캐시 설정 ==========
+CACHE_PATH = "./cache/"
+URL_CACHE_TTL = 7 * 24 * 60 * 60  # URL별 최종 결과 보관 기간 (초)
+DECISION_COLLECTION_NAME = "decision_cache"
+# 심의문 재사용 기준 코사인 거리. E5 임베딩은 무관한 기사끼리도 거리가 0.2~0.3 수준이므로
+# 사실상 같은 기사만 적중하도록 보수적으로 설정
+DECISION_CACHE_THRESHOLD = float(os.getenv("DECISION_CACHE_THRESHOLD", "0.05"))
 
 # ========== State 정의 ==========
 class AnalysisState(TypedDict):
     url: str
     article: dict
+    prompt_article: str
     image_desc: str
     similar_cases: str
     decision: str
     review_result: dict
     error: str
     violation_count: int
+    query_embedding: list
+    stream: bool
+    needs_review: bool
+    cited_articles: list
 
 # ========== 임베딩 함수 ==========
 class CustomEmbedding(EmbeddingFunction):
     def __init__(self):
-        self.model = SentenceTransformer("intfloat/multilingual-e5-large-instruct", device="cuda")
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = SentenceTransformer("intfloat/multilingual-e5-large-instruct", device=device)
+        if device == "cuda":
+            # FP16으로 메모리 대역폭 절반
+            self.model.half()
+            # FP16 문제는 변환 시점이 아니라 인코딩에서 드러나므로 시험 인코딩 후 실패하면 FP32로 복귀
+            try:
+                probe = self.model.encode(["warmup"], convert_to_tensor=True, show_progress_bar=False)
+                if not torch.isfinite(probe).all():
+                    raise ValueError("FP16 임베딩에 NaN/Inf 발생")
+            except Exception:
+                self.model.float()
 
     def __call__(self, input):
-        return self.model.encode(input).tolist()
+        # Chroma는 numpy 배열을 그대로 받으므로 list 변환 없이 float32 배열 반환
+        return self.model.encode(
+            input,
+            batch_size=len(input),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).astype('float32', copy=False)  # FP16 모델 출력도 float32로 맞춤
+
+# ========== HTTP 세션 (이미지 다운로드용 연결 재사용) ==========
+http_session = requests.Session()
+http_session.headers.update({'User-Agent': 'Mozilla/5.0'})
+_http_adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+)
+http_session.mount("https://", _http_adapter)
+http_session.mount("http://", _http_adapter)
 
 ef = CustomEmbedding()
 client = chromadb.PersistentClient(path=CHROMA_PATH, settings=Settings())
 collection = client.get_collection(name=COLLECTION_NAME)
 
+# ========== 캐시 ==========
+# 1) URL 캐시: 동일 URL의 최종 분석 결과 재사용 (diskcache 설치 시)
+# 2) 시맨틱 캐시: 기사 임베딩이 거의 같은 기존 기사의 심의문 재사용
+url_cache = diskcache.Cache(CACHE_PATH) if DISKCACHE_AVAILABLE else None
+decision_collection = client.get_or_create_collection(
+    name=DECISION_COLLECTION_NAME,
+    # 생성 시에만 적용: 고정된 저지연 검색 예산
+    metadata={
+        "hnsw:space": "cosine",
+        "hnsw:M": 32,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": 64,
+    }
+)
+
+def lookup_cached_decision(query_embedding) -> Optional[dict]:
+    """임베딩 거리가 임계값 이내인 기존 기사의 심의 결과 메타데이터 반환 (없으면 None)"""
+    try:
+        if decision_collection.count() == 0:
+            return None
+        results = decision_collection.query(
+            query_embeddings=[query_embedding],
+            n_results=1,
+            include=["metadatas", "distances"]
+        )
+        if results['distances'][0] and results['distances'][0][0] < DECISION_CACHE_THRESHOLD:
+            return results['metadatas'][0][0]
+    except Exception as e:
+        logger.warning("   ⚠️ 심의문 캐시 조회 실패: %s", e)
+    return None
+
+def store_cached_decision(query_embedding, text: str, decision: str, needs_review: bool, cited_articles: list):
+    """생성된 심의문을 기사 임베딩과 함께 시맨틱 캐시에 저장"""
+    # 빈 기사 텍스트는 저장하지 않음 (모든 추출 실패가 같은 항목을 공유하게 됨)
+    if not text.strip():
+        return
+    try:
+        decision_collection.upsert(
+            ids=[hashlib.sha256(text.encode('utf-8')).hexdigest()],
+            embeddings=[query_embedding],
+            documents=[text],
+            # Chroma 메타데이터는 스칼라 값만 허용하므로 인용 조항은 문자열로 저장
+            metadatas=[{
+                "decision": decision,
+                "needs_review": needs_review,
+                "cited_articles": ", ".join(cited_articles),
+            }]
+        )
+    except Exception as e:
+        logger.warning("   ⚠️ 심의문 캐시 저장 실패: %s", e)
+
 # ========== 규정 및 프롬프트 ==========
 REGULATION = """당신은 한국신문윤리위원회 심의위원입니다.
 #신문윤리실천요강:
@@ -75,54 +189,65 @@ REGULATION = """당신은 한국신문윤리위원회 심의위원입니다.
 제16조「공익의 정의」①국가 안전 등 ②공중 안녕 ③범죄의 폭로 ④공중의 오도 방지"""
 
 # ========== 조항 파싱 및 검증 함수 ==========
+# 제○조「조항명」①항목1 ②항목2 ... 형식
+_ARTICLE_RE = re.compile(r'제(\d+)조「([^」]+)」(.+)')
+_ITEM_RE = re.compile(r'([\u2460-\u2469])([^\u2460-\u2469]+)')  # ①-⑩
+# "항", "호" 등의 텍스트와 괄호를 모두 제거하는 패턴
+_CORRECT_RE = re.compile(r'제(\d+)조「([^」]+)」([\u2460-\u2469])(?:항|호)?(?:\([^)]*\))*')
+
 def parse_regulation_dict():
     """REGULATION을 파싱하여 조항 딕셔너리 생성"""
     articles = {}
+    # 루프 안에서 반복 조회하지 않도록 지역 변수로 바인딩
+    article_match = _ARTICLE_RE.match
+    item_finditer = _ITEM_RE.finditer
     lines = REGULATION.split('\n')
     for line in lines:
         if line.startswith('제'):
-            # 제○조「조항명」①항목1 ②항목2 ... 형식 파싱
-            match = re.match(r'제(\d+)조「([^」]+)」(.+)', line)
+            match = article_match(line)
             if match:
                 num = match.group(1)
                 name = match.group(2)
                 items_text = match.group(3)
                 # 항목 파싱
                 items = {}
-                item_pattern = r'([①②③④⑤⑥⑦⑧⑨⑩])([^①②③④⑤⑥⑦⑧⑨⑩]+)'
-                for item_match in re.finditer(item_pattern, items_text):
+                for item_match in item_finditer(items_text):
                     item_num = item_match.group(1)
                     item_content = item_match.group(2).strip()
                     items[item_num] = item_content
                 articles[num] = {'name': name, 'items': items}
     return articles
 
-REGULATION_DICT = parse_regulation_dict()
+@lru_cache(maxsize=1)
+def get_regulation_dict():
+    """파싱된 조항 딕셔너리 (첫 사용 시 1회 파싱)"""
+    return parse_regulation_dict()
+
+@lru_cache(maxsize=1)
+def get_article_replacements():
+    """(조 번호, 항목 번호) → 교정된 조항 참조 문자열 테이블 (첫 사용 시 1회 구성)"""
+    replacements = {}
+    for article_num, article in get_regulation_dict().items():
+        correct_name = article['name']
+        items = article['items']
+        # 정규식이 허용하는 ①~⑩ 전체를 채워 두어 치환 시 조회 한 번으로 끝냄
+        for item_num in '①②③④⑤⑥⑦⑧⑨⑩':
+            if item_num in items:
+                replacements[(article_num, item_num)] = f'제{article_num}조「{correct_name}」{item_num}({items[item_num]})'
+            else:
+                # 항목이 없으면 원본 유지하되 조항명만 수정
+                replacements[(article_num, item_num)] = f'제{article_num}조「{correct_name}」{item_num}'
+    return replacements
 
 def correct_article_reference(text):
-    """심의문의 조항 참조를 REGULATION_DICT에 맞게 자동 수정"""
-    # "항", "호" 등의 텍스트와 괄호를 모두 제거하는 패턴
-    pattern = r'제(\d+)조「([^」]+)」([①②③④⑤⑥⑦⑧⑨⑩])(?:항|호)?(?:\([^)]*\))*'
+    """심의문의 조항 참조를 조항 딕셔너리에 맞게 자동 수정"""
+    replacements = get_article_replacements()
 
     def replace_match(match):
-        article_num = match.group(1)
-        cited_name = match.group(2).strip()
-        item_num = match.group(3)
-
-        if article_num in REGULATION_DICT:
-            correct_name = REGULATION_DICT[article_num]['name']
-            items = REGULATION_DICT[article_num]['items']
+        # 없는 조항은 원문 그대로 유지
+        return replacements.get((match.group(1), match.group(3)), match.group(0))
 
-            # 항목이 존재하는지 확인
-            if item_num in items:
-                item_content = items[item_num]
-                return f'제{article_num}조「{correct_name}」{item_num}({item_content})'
-            else:
-                # 항목이 없으면 원본 유지하되 조항명만 수정
-                return f'제{article_num}조「{correct_name}」{item_num}'
-        return match.group(0)
-
-    return re.sub(pattern, replace_match, text)
+    return _CORRECT_RE.sub(replace_match, text)
 
 INST_PROMPT = """#심의 지침:
 1. **보수적 판단 원칙**: 신문윤리실천요강을 체계적으로 검토하되, 매우 보수적으로 판단
@@ -151,120 +276,265 @@ INST_PROMPT = """#심의 지침:
 - 유사 사례의 자연스러운 문장체 참고
 - "1)", "2)", "3)" 등의 번호나 소제목 절대 사용 금지"""
 
-# ========== Gemini API 호출 함수 ==========
-def call_gemini(prompt: str, image_data: str = None, temperature: float = 0.0) -> str:
-    """Gemini API 호출"""
-    model = genai.GenerativeModel(MODEL_NAME)
+# ========== 정적 프롬프트 (모듈 로드 시 1회 구성) ==========
+DECIDE_PREFIX = f"{REGULATION}\n\n{INST_PROMPT}\n\n#기사:\n"
+
+# 1차 판정용 접미어: 전체 심의문 대신 위반 여부만 출력
+PRECHECK_SUFFIX = "\n\n#1차 판정:\n위 작성 형식은 무시하고, 명백하고 심각한 위반이 있으면 Y, 위반 없음이면 N 한 글자만 출력하시오."
+
+# 구조화 출력: 심의문과 함께 자체 검증 결과를 받아 불확실할 때만 검토 단계 호출
+DECISION_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "decision": types.Schema(type=types.Type.STRING),
+        "cited_articles": types.Schema(type=types.Type.ARRAY, items=types.Schema(type=types.Type.STRING)),
+        "needs_review": types.Schema(type=types.Type.BOOLEAN),
+    },
+    required=["decision", "cited_articles", "needs_review"],
+)
+DECISION_JSON_SUFFIX = """
 
-    generation_config = genai.GenerationConfig(
+#출력 항목 (JSON):
+- decision: 위 작성 형식에 따른 심의문 (위반 없음이면 "위반 없음"만)
+- cited_articles: 심의문에 인용한 조항 목록 (예: "제3조④"), 위반 없음이면 빈 목록
+- needs_review: 인용 조항이 신문윤리실천요강과 정확히 일치하는지, 심의문이 기사 내용과 일치하는지 조금이라도 불확실하면 true, 확실하면 false"""
+
+REVIEW_HEAD = "당신은 신문윤리위원회 검토 담당자입니다. 생성된 심의문을 검토하고 수정하세요.\n\n"
+
+REVIEW_TAIL = f"""
+
+#신문윤리실천요강:
+{REGULATION}
+
+#검토 임무 (반드시 준수):
+1. **조항 정확성**: 인용된 조항이 신문윤리실천요강에 정확히 존재하는지 확인(조항 번호, 조항명 대조)하고 틀린 부분 수정
+2. **기사 관련성**: 심의문이 실제 기사 내용과 일치하는지 확인(환각 내용 삭제)하고 필요시 수정
+3. **형식 검증 및 수정**:
+   - "1)", "2)", "3)" 등의 번호나 소제목이 있으면 모두 삭제하고 자연스러운 문장체로 수정
+   - 반드시: 기사 요약(2~3문장) → 문제점(1~2문장) → 근거(1~2문장) → 결론("따라서 위 보도는...") 순서 준수
+4. **검토 의견 완전 제거**: "심의문에서 언급된...", "확인되지 않습니다", "검토 결과..." 등의 검토 의견을 절대 포함하지 말 것
+   - 검토자의 메타적 코멘트는 모두 삭제
+   - 오직 심의문 본문만 출력
+
+수정된 최종 심의문만 출력하시오 (검토 의견 절대 포함 금지):"""
+
+# ========== Gemini API 호출 함수 ==========
+@lru_cache(maxsize=None)
+def get_generation_config(temperature: float, max_tokens: int) -> types.GenerateContentConfig:
+    """(temperature, max_tokens)별 GenerateContentConfig"""
+    return types.GenerateContentConfig(
         temperature=temperature,
-        max_output_tokens=8192,
+        max_output_tokens=max_tokens,
     )
 
+@lru_cache(maxsize=None)
+def get_decision_config(max_tokens: int) -> types.GenerateContentConfig:
+    """심의문 생성용 JSON 구조화 출력 config"""
+    return types.GenerateContentConfig(
+        temperature=0.0,
+        max_output_tokens=max_tokens,
+        response_mime_type="application/json",
+        response_schema=DECISION_SCHEMA,
+    )
+
+def call_gemini(prompt: str, image_data: bytes = None, temperature: float = 0.0, max_tokens: int = 2048) -> str:
+    """Gemini API 호출"""
     if image_data:
-        # 이미지와 텍스트 함께 전송
-        image_part = {
-            "mime_type": "image/jpeg",
-            "data": base64.b64decode(image_data)
-        }
-        response = model.generate_content(
-            [prompt, image_part],
-            generation_config=generation_config
-        )
+        # 이미지와 텍스트 함께 전송 (JPEG 바이트를 그대로 전달)
+        contents = [prompt, types.Part.from_bytes(data=image_data, mime_type="image/jpeg")]
     else:
         # 텍스트만 전송
-        response = model.generate_content(
-            prompt,
-            generation_config=generation_config
-        )
+        contents = prompt
 
+    response = gemini_client.models.generate_content(
+        model=MODEL_NAME,
+        contents=contents,
+        config=get_generation_config(temperature, max_tokens)
+    )
+    if response.text is None:
+        raise ValueError("Gemini 응답에 텍스트가 없습니다.")
     return response.text
 
+def call_gemini_stream(prompt: str, temperature: float = 0.0, max_tokens: int = 2048) -> Iterator[str]:
+    """Gemini API 스트리밍 호출 - 생성되는 대로 텍스트 조각을 반환"""
+    response = gemini_client.models.generate_content_stream(
+        model=MODEL_NAME,
+        contents=prompt,
+        config=get_generation_config(temperature, max_tokens)
+    )
+    for chunk in response:
+        # 종료 청크 등 텍스트가 없는 청크는 건너뜀
+        if chunk.text:
+            yield chunk.text
+
+def call_gemini_decision(prompt: str, max_tokens: int = 2048) -> dict:
+    """구조화(JSON) 심의문 생성 - {decision, cited_articles, needs_review} 반환"""
+    response = gemini_client.models.generate_content(
+        model=MODEL_NAME,
+        contents=prompt + DECISION_JSON_SUFFIX,
+        config=get_decision_config(max_tokens)
+    )
+    if response.text is None:
+        raise ValueError("Gemini 응답에 텍스트가 없습니다.")
+    try:
+        result = json.loads(response.text)
+    except ValueError:
+        # JSON이 깨진 경우 원문을 심의문으로 보고 검토 단계 수행
+        return {"decision": response.text, "cited_articles": [], "needs_review": True}
+    return {
+        "decision": result.get("decision", ""),
+        "cited_articles": result.get("cited_articles", []),
+        "needs_review": result.get("needs_review", True),
+    }
+
+def stream_to_console(prompt: str, temperature: float = 0.0, max_tokens: int = 2048) -> str:
+    """스트리밍 응답을 콘솔에 바로 출력하고 전체 텍스트 반환"""
+    chunks = []
+    for text in call_gemini_stream(prompt, temperature=temperature, max_tokens=max_tokens):
+        print(text, end='', flush=True)
+        chunks.append(text)
+    print()
+    return ''.join(chunks)
+
+# ========== 워밍업 ==========
+# 첫 분석 요청이 CUDA 커널 로드, HNSW 인덱스 디스크 로드, Gemini 연결 수립 비용을
+# 떠안지 않도록 미리 한 번 호출
+if os.getenv("WARMUP", "1") == "1":
+    try:
+        collection.query(query_embeddings=ef(["warmup"]), n_results=1)
+    except Exception as e:
+        logger.warning("⚠️ 임베딩/벡터 검색 워밍업 실패: %s", e)
+    try:
+        call_gemini("ok", max_tokens=8)
+    except Exception as e:
+        logger.warning("⚠️ Gemini 워밍업 실패: %s", e)
+
 # ========== Node 함수들 ==========
 def extract_node(state: AnalysisState) -> AnalysisState:
     """1. 기사 추출"""
-    print(f"\n1️⃣ 기사 추출: {state['url']}")
+    logger.info("1️⃣ 기사 추출: %s", state['url'])
     article = extract_article(state['url'])
     if not article or not article.get('text'):
         state['error'] = "기사 추출 실패"
         return state
+    # 본문 절단 및 프롬프트용 기사 텍스트는 여기서 한 번만 만들고 이후 노드에서 재사용
+    article['body_2000'] = article['text'][:2000]
     state['article'] = article
-    print(f"   ✅ 제목: {article.get('title', '')[:50]}...")
+    state['prompt_article'] = f"{article.get('title') or ''} {article['body_2000']}"
+    logger.info("   ✅ 제목: %.50s...", article.get('title') or '')
     return state
 
-def image_node(state: AnalysisState) -> AnalysisState:
-    """2. 이미지 처리"""
-    print("\n2️⃣ 이미지 처리")
+def image_node(state: AnalysisState) -> dict:
+    """2. 이미지 처리 (search_node와 병렬 실행되므로 image_desc만 반환)"""
+    logger.info("2️⃣ 이미지 처리")
     article = state.get('article', {})
     img_url = article.get('image_url')
 
     if not img_url:
-        print("   ℹ️ 이미지 없음")
-        state['image_desc'] = None
-        return state
+        logger.info("   ℹ️ 이미지 없음")
+        return {'image_desc': None}
 
     try:
-        resp = requests.get(img_url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
+        resp = http_session.get(img_url, timeout=10)
+        content_type = resp.headers.get('Content-Type', '')
+
+        # Image.open은 헤더만 읽으므로 해상도 확인에는 디코딩 비용이 들지 않음
         img = Image.open(BytesIO(resp.content))
-        if img.mode == 'RGBA':
-            bg = Image.new('RGB', img.size, (255, 255, 255))
-            bg.paste(img, mask=img.split()[-1])
-            img = bg
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
 
-        buffer = BytesIO()
-        img.save(buffer, format='JPEG', quality=85)
-        b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        if (content_type.startswith('image/jpeg') and len(resp.content) < JPEG_PASSTHROUGH_MAX_BYTES
+                and max(img.size) <= MAX_IMAGE_SIZE[0]):
+            # 이미 작은 JPEG는 디코딩/재인코딩 없이 그대로 전송
+            image_data = resp.content
+        else:
+            # PNG/WebP/RGBA 또는 용량·해상도가 큰 이미지만 변환 및 축소
+            if img.mode == 'RGBA':
+                bg = Image.new('RGB', img.size, (255, 255, 255))
+                bg.paste(img, mask=img.split()[-1])
+                img = bg
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+            # 고해상도 이미지는 축소하여 전송량 및 토큰 수 절감
+            img.thumbnail(MAX_IMAGE_SIZE, Image.LANCZOS)
+
+            buffer = BytesIO()
+            img.save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+            image_data = buffer.getvalue()
 
         # Gemini로 이미지 설명 생성
-        image_desc = call_gemini("이 이미지를 한국어로 상세히 설명해주세요.", image_data=b64, temperature=0.3)
-        state['image_desc'] = image_desc
-        print(f"   ✅ 이미지 설명 생성 완료")
+        image_desc = call_gemini("이 이미지를 한국어로 상세히 설명해주세요.", image_data=image_data, temperature=0.3, max_tokens=512)
+        logger.info("   ✅ 이미지 설명 생성 완료")
     except Exception as e:
-        print(f"   ⚠️ 이미지 처리 실패: {e}")
-        state['image_desc'] = None
+        logger.warning("   ⚠️ 이미지 처리 실패: %s", e)
+        image_desc = None
 
-    return state
+    return {'image_desc': image_desc}
 
-def search_node(state: AnalysisState) -> AnalysisState:
-    """3. 유사 사례 검색"""
-    print("\n3️⃣ 유사 사례 검색")
-    article = state.get('article', {})
-    text = f"{article.get('title', '')} {article.get('text', '')[:2000]}"
+def search_node(state: AnalysisState) -> dict:
+    """3. 유사 사례 검색 (image_node와 병렬 실행되므로 similar_cases만 반환)"""
+    logger.info("3️⃣ 유사 사례 검색")
+    text = state.get('prompt_article', '')
 
     try:
-        query_emb = ef([text])
+        query_emb = ef([QUERY_PREFIX + text])
         results = collection.query(query_embeddings=query_emb, n_results=5)
         cases = []
         for i in range(len(results["documents"][0])):
             reason = results['metadatas'][0][i]['reason']
             cases.append(f"{i+1}. {reason}")
-        state['similar_cases'] = "\n".join(cases)
-        print(f"   ✅ {len(cases)}개 사례 검색 완료")
+        similar_cases = "\n".join(cases)
+        query_embedding = query_emb[0]
+        logger.info("   ✅ %d개 사례 검색 완료", len(cases))
     except Exception as e:
-        print(f"   ⚠️ 검색 실패: {e}")
-        state['similar_cases'] = ""
-
-    return state
+        logger.warning("   ⚠️ 검색 실패: %s", e)
+        similar_cases = ""
+        query_embedding = None
+
+    return {'similar_cases': similar_cases, 'query_embedding': query_embedding}
+
+def _count_case_verdicts(similar_cases: str) -> tuple:
+    """유사 사례의 (위반, 위반 없음) 개수를 한 번의 순회로 계산"""
+    violation_count = no_violation_count = 0
+    for line in similar_cases.splitlines():
+        if '위반 없음' in line or '위반없음' in line:
+            no_violation_count += 1
+        elif '위반' in line:
+            violation_count += 1
+    return violation_count, no_violation_count
+
+def precheck_violation(prompt: str) -> bool:
+    """위반 여부만 Y/N 한 글자로 1차 판정 (판정 실패 시 위반 가능성 있음으로 간주)"""
+    try:
+        verdict = call_gemini(prompt + PRECHECK_SUFFIX, temperature=0.0, max_tokens=8)
+    except Exception as e:
+        logger.warning("   ⚠️ 1차 판정 실패: %s", e)
+        return True
+    return not verdict.strip().upper().startswith('N')
 
 def decide_node(state: AnalysisState) -> AnalysisState:
     """4. 심의문 생성"""
-    print("\n4️⃣ 심의문 생성")
-    article = state.get('article', {})
+    logger.info("4️⃣ 심의문 생성")
+    # 앞 단계에서 실패했으면 Gemini 호출 및 캐시 저장 생략
+    if state.get('error'):
+        return state
     similar_cases = state.get('similar_cases', '')
 
     # 유사 사례 위반 개수 카운팅 (출력용)
-    violation_count = 0
-    no_violation_count = 0
-    if similar_cases:
-        for line in similar_cases.split('\n'):
-            if '위반' in line and '위반 없음' not in line and '위반없음' not in line:
-                violation_count += 1
-            elif '위반 없음' in line or '위반없음' in line:
-                no_violation_count += 1
+    violation_count, no_violation_count = _count_case_verdicts(similar_cases)
+
+    article_text = state.get('prompt_article', '')
+    query_embedding = state.get('query_embedding')
 
-    prompt = f"{REGULATION}\n\n{INST_PROMPT}\n\n#기사:\n{article.get('title', '')} {article.get('text', '')[:2000]}"
+    # 거의 같은 기사의 심의문이 이미 있으면 Gemini 호출 생략
+    cached = lookup_cached_decision(query_embedding) if query_embedding is not None else None
+    if cached is not None:
+        state['decision'] = cached['decision']
+        state['needs_review'] = cached.get('needs_review', True)
+        state['cited_articles'] = [a for a in cached.get('cited_articles', '').split(', ') if a]
+        state['violation_count'] = violation_count
+        logger.info("   ♻️ 캐시된 심의문 사용 (유사 사례: 위반 %d/5, 위반없음 %d/5)", violation_count, no_violation_count)
+        return state
+
+    prompt = DECIDE_PREFIX + article_text
     if state.get('image_desc'):
         prompt += f"\n\n#이미지:\n{state['image_desc']}"
     if similar_cases:
@@ -275,12 +545,21 @@ def decide_node(state: AnalysisState) -> AnalysisState:
             prompt += f"\n\n**중요**: 유사 사례 5개 중 {no_violation_count}개가 '위반 없음'입니다. 4개 이상이므로 이 기사도 '위반 없음'을 강력하게 고려하십시오."
 
     try:
-        decision = call_gemini(prompt, temperature=0.0)
+        if precheck_violation(prompt):
+            result = call_gemini_decision(prompt, max_tokens=2048)
+        else:
+            logger.info("   ℹ️ 1차 판정: 위반 없음")
+            result = {"decision": "위반 없음", "cited_articles": [], "needs_review": False}
+        decision = result['decision']
         state['decision'] = decision
+        state['needs_review'] = result['needs_review']
+        state['cited_articles'] = result['cited_articles']
         state['violation_count'] = violation_count
-        print(f"   ✅ 심의문 생성 완료 (유사 사례: 위반 {violation_count}/5, 위반없음 {no_violation_count}/5)")
+        if query_embedding is not None:
+            store_cached_decision(query_embedding, article_text, decision, result['needs_review'], result['cited_articles'])
+        logger.info("   ✅ 심의문 생성 완료 (유사 사례: 위반 %d/5, 위반없음 %d/5)", violation_count, no_violation_count)
     except Exception as e:
-        print(f"   ❌ 심의문 생성 실패: {e}")
+        logger.error("   ❌ 심의문 생성 실패: %s", e)
         state['error'] = f"심의문 생성 실패: {e}"
         state['decision'] = ""
         state['violation_count'] = violation_count
@@ -289,13 +568,16 @@ def decide_node(state: AnalysisState) -> AnalysisState:
 
 def review_node(state: AnalysisState) -> AnalysisState:
     """5. 최종 검토 - 조항 정확성 검증 및 기사 관련성 확인"""
-    print("\n5️⃣ 최종 검토")
+    logger.info("5️⃣ 최종 검토")
+    # 기사 추출 또는 심의문 생성이 실패했으면 검토할 내용이 없음
+    if state.get('error'):
+        return state
     article = state.get('article', {})
     decision = state.get('decision', '')
 
     # "위반 없음"이면 정확히 3글자인지 확인
     if "위반 없음" in decision or "위반없음" in decision:
-        print("   ✅ 위반 없음 - 검토 완료")
+        logger.info("   ✅ 위반 없음 - 검토 완료")
         state['review_result'] = {
             "passed": True,
             "issues": "",
@@ -303,32 +585,27 @@ def review_node(state: AnalysisState) -> AnalysisState:
         }
         return state
 
-    review_prompt = f"""당신은 신문윤리위원회 검토 담당자입니다. 생성된 심의문을 검토하고 수정하세요.
-
-#분석 대상 기사:
-제목: {article.get('title', '')}
-본문: {article.get('text', '')[:2000]}
-
-#생성된 심의문:
-{decision}
-
-#신문윤리실천요강:
-{REGULATION}
-
-#검토 임무 (반드시 준수):
-1. **조항 정확성**: 인용된 조항이 신문윤리실천요강에 정확히 존재하는지 확인(조항 번호, 조항명 대조)하고 틀린 부분 수정
-2. **기사 관련성**: 심의문이 실제 기사 내용과 일치하는지 확인(환각 내용 삭제)하고 필요시 수정
-3. **형식 검증 및 수정**:
-   - "1)", "2)", "3)" 등의 번호나 소제목이 있으면 모두 삭제하고 자연스러운 문장체로 수정
-   - 반드시: 기사 요약(2~3문장) → 문제점(1~2문장) → 근거(1~2문장) → 결론("따라서 위 보도는...") 순서 준수
-4. **검토 의견 완전 제거**: "심의문에서 언급된...", "확인되지 않습니다", "검토 결과..." 등의 검토 의견을 절대 포함하지 말 것
-   - 검토자의 메타적 코멘트는 모두 삭제
-   - 오직 심의문 본문만 출력
+    # 심의문 생성 단계의 자체 검증을 통과하면 Gemini 검토 호출 없이 조항 자동 수정만 적용
+    if not state.get('needs_review', True):
+        logger.info("   ✅ 자체 검증 통과 - 조항 자동 수정만 적용")
+        state['review_result'] = {
+            "passed": True,
+            "issues": "",
+            "final_decision": correct_article_reference(decision.strip())
+        }
+        return state
 
-수정된 최종 심의문만 출력하시오 (검토 의견 절대 포함 금지):"""
+    review_prompt = (
+        REVIEW_HEAD
+        + "#분석 대상 기사:\n제목: " + (article.get('title') or '')
+        + "\n본문: " + article.get('body_2000', '')
+        + "\n\n#생성된 심의문:\n" + decision
+        + REVIEW_TAIL
+    )
 
     try:
-        final_decision = call_gemini(review_prompt, temperature=0.0)
+        generate = stream_to_console if state.get('stream', True) else call_gemini
+        final_decision = generate(review_prompt, temperature=0.0, max_tokens=2048)
 
         # 조항 자동 수정 적용
         corrected_decision = correct_article_reference(final_decision.strip())
@@ -339,9 +616,9 @@ def review_node(state: AnalysisState) -> AnalysisState:
             "final_decision": corrected_decision
         }
 
-        print(f"   ✅ 검토 완료 - 조항 정확성 및 기사 관련성 검증 완료")
+        logger.info("   ✅ 검토 완료 - 조항 정확성 및 기사 관련성 검증 완료")
     except Exception as e:
-        print(f"   ❌ 검토 실패: {e}")
+        logger.error("   ❌ 검토 실패: %s", e)
         state['review_result'] = {
             "passed": False,
             "issues": f"검토 오류: {e}",
@@ -351,6 +628,12 @@ def review_node(state: AnalysisState) -> AnalysisState:
     return state
 
 # ========== 워크플로우 구성 ==========
+def route_after_extract(state: AnalysisState) -> list:
+    """기사 추출 실패 시 이후 단계를 모두 건너뜀, 성공 시 이미지 처리와 검색으로 분기"""
+    if state.get('error'):
+        return [END]
+    return ["image", "search"]
+
 def create_workflow():
     workflow = StateGraph(AnalysisState)
 
@@ -360,23 +643,37 @@ def create_workflow():
     workflow.add_node("decide", decide_node)
     workflow.add_node("review", review_node)
 
+    # 이미지 처리와 유사 사례 검색은 서로 독립적이므로 병렬 실행 후 decide에서 합류
+    # 기사 추출이 실패하면 Gemini 호출 없이 바로 종료
     workflow.set_entry_point("extract")
-    workflow.add_edge("extract", "image")
-    workflow.add_edge("image", "search")
-    workflow.add_edge("search", "decide")
+    workflow.add_conditional_edges("extract", route_after_extract, ["image", "search", END])
+    workflow.add_edge(["image", "search"], "decide")
     workflow.add_edge("decide", "review")
     workflow.add_edge("review", END)
 
     return workflow.compile()
 
-# ========== 실행 ==========
-def analyze_article(url: str):
-    """기사 분석 실행"""
-    print(f"\n{'='*60}\n🔍 분석 시작: {url}\n{'='*60}")
-
-    app = create_workflow()
-    result = app.invoke({"url": url})
+# 노드 등록 및 그래프 컴파일은 한 번만 수행하고 모든 분석에서 재사용
+workflow_app = create_workflow()
 
+# ========== 실행 ==========
+def get_cached_result(url: str) -> Optional[dict]:
+    """URL 캐시에서 분석 결과 조회"""
+    if url_cache is None:
+        return None
+    return url_cache.get(hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+def cache_result(url: str, result: dict):
+    """에러 없이 검토까지 통과한 분석 결과만 URL 캐시에 저장"""
+    if url_cache is None or result.get('error'):
+        return
+    # 검토 단계의 일시적인 Gemini 오류로 검토되지 않은 심의문은 저장하지 않음
+    if not result.get('review_result', {}).get('passed', False):
+        return
+    url_cache.set(hashlib.sha256(url.encode('utf-8')).hexdigest(), result, expire=URL_CACHE_TTL)
+
+def print_result(result: dict):
+    """분석 결과 출력 (에러 시 None 반환)"""
     if result.get('error'):
         print(f"\n❌ 에러: {result['error']}")
         return None
@@ -387,6 +684,9 @@ def analyze_article(url: str):
     violation_count = result.get('violation_count', 0)
     print(f"\n📊 유사 사례: {violation_count}/5개 위반")
 
+    if result.get('cited_articles'):
+        print(f"\n📌 인용 조항: {', '.join(result['cited_articles'])}")
+
     review = result.get('review_result', {})
     print(f"\n⚖️ 최종 심의문:\n{review.get('final_decision', '')}")
 
@@ -395,7 +695,50 @@ def analyze_article(url: str):
 
     return result
 
+def analyze_article(url: str):
+    """기사 분석 실행"""
+    print(f"\n{'='*60}\n🔍 분석 시작: {url}\n{'='*60}")
+
+    result = get_cached_result(url)
+    if result is not None:
+        logger.info("♻️ 캐시된 분석 결과 사용")
+    else:
+        result = workflow_app.invoke({"url": url})
+        cache_result(url, result)
+
+    return print_result(result)
+
+async def analyze_article_async(url: str):
+    """기사 분석 실행 (비동기) - 동기 노드는 LangGraph가 스레드에서 실행"""
+    print(f"\n🔍 분석 시작: {url}")
+
+    result = get_cached_result(url)
+    if result is not None:
+        logger.info("♻️ 캐시된 분석 결과 사용: %s", url)
+    else:
+        # 여러 기사가 동시에 진행되므로 토큰 스트리밍 출력은 끔
+        result = await workflow_app.ainvoke({"url": url, "stream": False})
+        cache_result(url, result)
+
+    return print_result(result)
+
+async def analyze_articles(urls: list, concurrency: int = 5) -> list:
+    """여러 기사를 동시에 분석 (동시 실행 수는 concurrency로 제한)"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _guarded(url):
+        async with semaphore:
+            try:
+                return await analyze_article_async(url)
+            except Exception as e:
+                print(f"\n❌ 분석 실패 ({url}): {e}")
+                return None
+
+    return await asyncio.gather(*[_guarded(url) for url in urls])
+
 if __name__ == "__main__":
+    # 노드 진행 로그는 LOGLEVEL=WARNING 등으로 줄일 수 있음 (스트리밍 출력과 순서 유지를 위해 stdout 사용)
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "INFO").upper(), format="%(message)s", stream=sys.stdout)
     print(f"🤖 Gemini 2.0 Flash 모델 준비 완료!")
     print(f"   API Key: {GEMINI_API_KEY[:20]}...\n")
 
@@ -412,5 +755,4 @@ if __name__ == "__main__":
         "https://www.ccjournal.co.kr/5893"
     ]
 
-    for url in test_urls[:5]:  # 테스트용으로 1개만 실행
-        analyze_article(url)
+    asyncio.run(analyze_articles(test_urls[:5]))  # 테스트용으로 5개만 실행
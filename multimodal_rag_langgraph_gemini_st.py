@@ -3,22 +3,35 @@
 Streamlit 기반 뉴스 심의문 분석 시스템 (Gemini 2.0 Flash 버전)
 """
 import streamlit as st
+import asyncio
+import hashlib
 import os
 import re
-from typing import TypedDict
+from typing import Iterator, TypedDict
 from langgraph.graph import StateGraph, END
-import google.generativeai as genai
+from google import genai
+from google.genai import types
 import chromadb
+import torch
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from chromadb.utils.embedding_functions import EmbeddingFunction
 from news_text_scraper import extract_article
+from embedding_config import QUERY_PREFIX
 import base64
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image
 from io import BytesIO
 import time
 
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
 # ========== 페이지 설정 ==========
 st.set_page_config(
     page_title="뉴스 심의문 분석 시스템",
@@ -50,6 +63,10 @@ st.sidebar.markdown("""
 - 분석에는 수 분이 소요될 수 있습니다
 """)
 
+# 캐시 비우기 (메모리 정리 또는 모델/DB 재로드가 필요할 때)
+# 기사 디스크 캐시도 함께 비우므로 실제 처리는 캐시 정의 뒤에서 수행
+clear_caches = st.sidebar.button("🧹 캐시 비우기")
+
 # ========== 메인 화면 ==========
 st.title("📰 뉴스 심의문 분석 시스템")
 st.markdown("**Gemini 2.0 Flash 기반 - 한국신문윤리위원회 심의 기준 적용**")
@@ -58,6 +75,12 @@ st.markdown("---")
 # ========== 설정 ==========
 CHROMA_PATH = "./chroma/"
 COLLECTION_NAME = "press_ethics_e5_072025"
+MODEL_NAME = 'gemini-2.0-flash-exp'
+MAX_IMAGE_SIZE = (1024, 1024)  # Gemini 전송 전 이미지 최대 크기 (긴 변 기준)
+MAX_IMAGE_BYTES = 8 * 1024 * 1024  # 내려받을 이미지 최대 용량
+ARTICLE_CACHE_PATH = "./cache/articles/"
+ARTICLE_CACHE_TTL = 7 * 24 * 60 * 60  # 기사 추출 결과 보관 기간 (초)
+ARTICLE_CACHE_SIZE_LIMIT = 256 * 1024 * 1024  # 초과 시 오래된 항목부터 정리 (바이트)
 
 # ========== State 정의 ==========
 class AnalysisState(TypedDict):
@@ -71,19 +94,47 @@ class AnalysisState(TypedDict):
     violation_count: int
 
 # ========== 임베딩 함수 (캐싱) ==========
-@st.cache_resource
+@st.cache_resource(max_entries=1, ttl=24 * 60 * 60)
 def load_embedding_model():
     """임베딩 모델 로드 (캐싱)"""
     class CustomEmbedding(EmbeddingFunction):
         def __init__(self):
-            self.model = SentenceTransformer("intfloat/multilingual-e5-large-instruct", device="cpu")
+            if torch.cuda.is_available():
+                device = "cuda"
+            elif torch.backends.mps.is_available():
+                device = "mps"
+            else:
+                device = "cpu"
+            self.model = SentenceTransformer("intfloat/multilingual-e5-large-instruct", device=device)
+            if device == "cuda":
+                # FP16으로 메모리 대역폭 절반, 처리량 약 2배
+                self.model.half()
+                # FP16 문제는 변환 시점이 아니라 인코딩에서 드러나므로 시험 인코딩 후 실패하면 FP32로 복귀
+                try:
+                    probe = self.model.encode(["warmup"], convert_to_tensor=True, show_progress_bar=False)
+                    if not torch.isfinite(probe).all():
+                        raise ValueError("FP16 임베딩에 NaN/Inf 발생")
+                except Exception:
+                    self.model.float()
+
+        def encode_many(self, texts, batch_size: int = 32):
+            """여러 문서를 배치 단위로 임베딩 (정규화된 numpy 배열 반환)"""
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
 
         def __call__(self, input):
-            return self.model.encode(input).tolist()
+            # ChromaDB가 numpy 배열을 그대로 받으므로 파이썬 리스트로 변환하지 않음
+            # (FP16 모델 출력도 float32로 맞춤, 이미 float32면 복사 없음)
+            return self.encode_many(input).astype('float32', copy=False)
 
     return CustomEmbedding()
 
-@st.cache_resource
+@st.cache_resource(max_entries=1, ttl=24 * 60 * 60)
 def load_chroma_collection():
     """ChromaDB 컬렉션 로드 (캐싱)"""
     try:
@@ -94,6 +145,21 @@ def load_chroma_collection():
         st.error(f"❌ ChromaDB 로드 실패: {e}")
         return None
 
+@st.cache_resource(max_entries=1, ttl=24 * 60 * 60)
+def get_http_session():
+    """이미지 다운로드용 HTTP 세션 (연결 재사용, 캐싱)"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'Mozilla/5.0'})
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.3,
+                          status_forcelist=[502, 503, 504], raise_on_status=False)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 # ========== 규정 및 프롬프트 ==========
 REGULATION = """당신은 한국신문윤리위원회 심의위원입니다.
 #신문윤리실천요강:
@@ -114,49 +180,64 @@ REGULATION = """당신은 한국신문윤리위원회 심의위원입니다.
 제15조「언론인의 품위」①금품수수 및 향응, 청탁 금지 ②부당한 집단 영향력 행사 금지 ③광고·판매 등 영업행위 금지
 제16조「공익의 정의」①국가 안전 등 ②공중 안녕 ③범죄의 폭로 ④공중의 오도 방지"""
 
+# 제○조「조항명」①항목1 ②항목2 ... 형식
+_ARTICLE_RE = re.compile(r'제(\d+)조「([^」]+)」(.+)')
+_ITEM_RE = re.compile(r'([\u2460-\u2469])([^\u2460-\u2469]+)')  # ①-⑩
+# "항", "호" 등의 텍스트와 괄호를 모두 제거하는 패턴
+_CORRECT_RE = re.compile(r'제(\d+)조「([^」]+)」([\u2460-\u2469])(?:항|호)?(?:\([^)]*\))*')
+
 def parse_regulation_dict():
     """REGULATION을 파싱하여 조항 딕셔너리 생성"""
     articles = {}
+    # 루프 안에서 반복 조회하지 않도록 지역 변수로 바인딩
+    article_match = _ARTICLE_RE.match
+    item_finditer = _ITEM_RE.finditer
     lines = REGULATION.split('\n')
     for line in lines:
         if line.startswith('제'):
-            match = re.match(r'제(\d+)조「([^」]+)」(.+)', line)
+            match = article_match(line)
             if match:
                 num = match.group(1)
                 name = match.group(2)
                 items_text = match.group(3)
                 items = {}
-                item_pattern = r'([①②③④⑤⑥⑦⑧⑨⑩])([^①②③④⑤⑥⑦⑧⑨⑩]+)'
-                for item_match in re.finditer(item_pattern, items_text):
+                for item_match in item_finditer(items_text):
                     item_num = item_match.group(1)
                     item_content = item_match.group(2).strip()
                     items[item_num] = item_content
                 articles[num] = {'name': name, 'items': items}
     return articles
 
-REGULATION_DICT = parse_regulation_dict()
+@st.cache_resource(max_entries=1)
+def get_regulation_dict():
+    """파싱된 조항 딕셔너리 (Streamlit 재실행 간 공유)"""
+    return parse_regulation_dict()
+
+@st.cache_resource(max_entries=1)
+def get_article_replacements():
+    """(조 번호, 항목 번호) → 교정된 조항 참조 문자열 테이블 (Streamlit 재실행 간 공유)"""
+    replacements = {}
+    for article_num, article in get_regulation_dict().items():
+        correct_name = article['name']
+        items = article['items']
+        # 정규식이 허용하는 ①~⑩ 전체를 채워 두어 치환 시 조회 한 번으로 끝냄
+        for item_num in '①②③④⑤⑥⑦⑧⑨⑩':
+            if item_num in items:
+                replacements[(article_num, item_num)] = f'제{article_num}조「{correct_name}」{item_num}({items[item_num]})'
+            else:
+                # 항목이 없으면 원본 유지하되 조항명만 수정
+                replacements[(article_num, item_num)] = f'제{article_num}조「{correct_name}」{item_num}'
+    return replacements
 
 def correct_article_reference(text):
-    """심의문의 조항 참조를 REGULATION_DICT에 맞게 자동 수정"""
-    pattern = r'제(\d+)조「([^」]+)」([①②③④⑤⑥⑦⑧⑨⑩])(?:항|호)?(?:\([^)]*\))*'
+    """심의문의 조항 참조를 조항 딕셔너리에 맞게 자동 수정"""
+    replacements = get_article_replacements()
 
     def replace_match(match):
-        article_num = match.group(1)
-        cited_name = match.group(2).strip()
-        item_num = match.group(3)
-
-        if article_num in REGULATION_DICT:
-            correct_name = REGULATION_DICT[article_num]['name']
-            items = REGULATION_DICT[article_num]['items']
+        # 없는 조항은 원문 그대로 유지
+        return replacements.get((match.group(1), match.group(3)), match.group(0))
 
-            if item_num in items:
-                item_content = items[item_num]
-                return f'제{article_num}조「{correct_name}」{item_num}({item_content})'
-            else:
-                return f'제{article_num}조「{correct_name}」{item_num}'
-        return match.group(0)
-
-    return re.sub(pattern, replace_match, text)
+    return _CORRECT_RE.sub(replace_match, text)
 
 INST_PROMPT = """#심의 지침:
 1. **보수적 판단 원칙**: 신문윤리실천요강을 체계적으로 검토하되, 매우 보수적으로 판단
@@ -185,34 +266,172 @@ INST_PROMPT = """#심의 지침:
 - 유사 사례의 자연스러운 문장체 참고
 - "1)", "2)", "3)" 등의 번호나 소제목 절대 사용 금지"""
 
-# ========== Gemini API 호출 함수 ==========
-def call_gemini(api_key: str, prompt: str, image_data: str = None, temperature: float = 0.0) -> str:
-    """Gemini API 호출"""
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
+# ========== 정적 프롬프트 (모듈 로드 시 1회 구성) ==========
+DECIDE_PREFIX = f"{REGULATION}\n\n{INST_PROMPT}\n\n#기사:\n"
 
-    generation_config = genai.GenerationConfig(
+# ========== Gemini API 호출 함수 ==========
+@st.cache_resource(max_entries=8, ttl=24 * 60 * 60, show_spinner=False)
+def get_gemini_client(api_key: str) -> genai.Client:
+    """API 키별 Gemini 클라이언트 (캐싱 - 클라이언트가 자기 키를 보유하므로 세션 간 키가 섞이지 않음)"""
+    return genai.Client(api_key=api_key)
+
+def get_generation_config(temperature: float) -> types.GenerateContentConfig:
+    """Gemini 생성 설정"""
+    return types.GenerateContentConfig(
         temperature=temperature,
         max_output_tokens=8192,
     )
 
+def call_gemini(api_key: str, prompt: str, image_data: str = None, temperature: float = 0.0) -> str:
+    """Gemini API 호출"""
+    client = get_gemini_client(api_key)
+
     if image_data:
-        image_part = {
-            "mime_type": "image/jpeg",
-            "data": base64.b64decode(image_data)
-        }
-        response = model.generate_content(
-            [prompt, image_part],
-            generation_config=generation_config
-        )
+        contents = [prompt, types.Part.from_bytes(data=base64.b64decode(image_data), mime_type="image/jpeg")]
     else:
-        response = model.generate_content(
-            prompt,
-            generation_config=generation_config
-        )
+        contents = prompt
 
+    response = client.models.generate_content(
+        model=MODEL_NAME,
+        contents=contents,
+        config=get_generation_config(temperature)
+    )
+    if response.text is None:
+        raise ValueError("Gemini 응답에 텍스트가 없습니다.")
     return response.text
 
+def call_gemini_stream(api_key: str, prompt: str, temperature: float = 0.0) -> Iterator[str]:
+    """Gemini API 스트리밍 호출 (생성되는 대로 텍스트 조각 반환)"""
+    client = get_gemini_client(api_key)
+
+    response = client.models.generate_content_stream(
+        model=MODEL_NAME,
+        contents=prompt,
+        config=get_generation_config(temperature)
+    )
+    for chunk in response:
+        # 종료 청크 등 텍스트가 없는 청크는 건너뜀
+        if chunk.text:
+            yield chunk.text
+
+def write_stream_temporarily(container, chunks: Iterator[str]) -> str:
+    """스트리밍 응답을 임시 영역에 표시하고 전체 텍스트 반환 (완료 후 표시 영역 제거)"""
+    placeholder = container.empty()
+    try:
+        text = placeholder.write_stream(chunks)
+    finally:
+        placeholder.empty()
+    if not isinstance(text, str):
+        text = "".join(text)
+    if not text:
+        raise ValueError("Gemini 응답이 비어 있습니다")
+    return text
+
+# ========== 분석 단계 함수 ==========
+class ArticleNotFoundError(Exception):
+    """유효한 기사를 찾지 못함 (실패 결과는 캐시에 남기지 않도록 예외로 전달)"""
+
+@st.cache_resource(max_entries=1)
+def get_article_cache():
+    """기사 추출 결과 디스크 캐시 (앱 재시작 후에도 유지, diskcache 미설치 시 None)"""
+    if not DISKCACHE_AVAILABLE:
+        return None
+    # st.cache_data(persist="disk")는 디스크 항목을 만료·정리하지 않으므로 diskcache 사용
+    return diskcache.Cache(ARTICLE_CACHE_PATH, size_limit=ARTICLE_CACHE_SIZE_LIMIT)
+
+if clear_caches:
+    article_cache = get_article_cache()
+    if article_cache is not None:
+        article_cache.clear()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    st.sidebar.success("✅ 캐시를 비웠습니다")
+
+def cached_extract_article(url: str) -> dict:
+    """기사 추출 (URL 기준 캐싱 - 같은 URL 재분석 시 스크래핑 생략)"""
+    article_cache = get_article_cache()
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    if article_cache is not None:
+        article = article_cache.get(key)
+        if article is not None:
+            return article
+    article = extract_article(url)
+    if not article or not article.get('text'):
+        raise ArticleNotFoundError("유효한 기사를 찾을 수 없습니다.")
+    if article_cache is not None:
+        article_cache.set(key, article, expire=ARTICLE_CACHE_TTL)
+    return article
+
+@st.cache_data(ttl=24 * 60 * 60, max_entries=256, show_spinner=False)
+def cached_describe_image(image_hash: str, _image_data: str, _api_key: str) -> str:
+    """이미지 설명 생성 (이미지 해시 기준 캐싱 - 같은 이미지는 Gemini 호출 생략)"""
+    return call_gemini(_api_key, "이 이미지를 한국어로 상세히 설명해주세요.", image_data=_image_data, temperature=0.3)
+
+def download_image(img_url: str) -> str:
+    """기사 이미지를 내려받아 base64 JPEG로 변환"""
+    # 스트리밍으로 받아 최대 용량까지만 읽음 (비정상적으로 큰 이미지 차단)
+    with get_http_session().get(img_url, timeout=10, stream=True) as resp:
+        resp.raise_for_status()
+        data = resp.raw.read(MAX_IMAGE_BYTES + 1, decode_content=True)
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ValueError(f"이미지 용량 초과 (최대 {MAX_IMAGE_BYTES // (1024 * 1024)}MB)")
+
+    img = Image.open(BytesIO(data))
+    if img.mode == 'RGBA':
+        bg = Image.new('RGB', img.size, (255, 255, 255))
+        bg.paste(img, mask=img.split()[-1])
+        img = bg
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    # 긴 변 1024px로 축소 (설명 품질은 유지, 전송량 감소)
+    img.thumbnail(MAX_IMAGE_SIZE, Image.LANCZOS)
+
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+def describe_image(api_key: str, img_url: str) -> str:
+    """기사 이미지를 내려받아 Gemini로 설명 생성"""
+    b64 = download_image(img_url)
+    image_hash = hashlib.sha1(b64.encode('utf-8')).hexdigest()
+    return cached_describe_image(image_hash, b64, api_key)
+
+@st.cache_data(ttl=60 * 60, max_entries=512, show_spinner=False)
+def cached_similar_cases(text_hash: str, n_results: int, _text: str, _ef, _collection) -> tuple:
+    """유사 심의 사례 검색 (질의 텍스트 해시 기준 캐싱 - 임베딩과 벡터 검색 생략)"""
+    # CLI 버전과 같은 E5 지시문 형식으로 검색
+    query_emb = _ef([QUERY_PREFIX + _text])
+    results = _collection.query(query_embeddings=query_emb, n_results=n_results)
+    cases = []
+    violation_count = 0
+    no_violation_count = 0
+    for i in range(len(results["documents"][0])):
+        reason = results['metadatas'][0][i]['reason']
+        cases.append(f"{i+1}. {reason}")
+
+        # 위반 개수 카운팅
+        if '위반' in reason and '위반 없음' not in reason and '위반없음' not in reason:
+            violation_count += 1
+        elif '위반 없음' in reason or '위반없음' in reason:
+            no_violation_count += 1
+
+    return cases, violation_count, no_violation_count
+
+def search_similar_cases(ef, collection, text: str, n_results: int = 5) -> tuple:
+    """유사 심의 사례 검색 - (사례 목록, 위반 수, 위반 없음 수) 반환"""
+    text_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    return cached_similar_cases(text_hash, n_results, text, ef, collection)
+
+async def run_image_and_search(api_key: str, img_url: str, ef, collection, text: str) -> list:
+    """이미지 설명과 유사 사례 검색을 동시에 실행 (각 결과 또는 예외를 반환)
+
+    두 작업 모두 블로킹 I/O이므로 작업 스레드에서 실행하고, Streamlit 화면 갱신은
+    호출한 스크립트 스레드에서 결과를 받아 처리한다.
+    """
+    image_task = asyncio.to_thread(describe_image, api_key, img_url) if img_url else asyncio.sleep(0)
+    search_task = asyncio.to_thread(search_similar_cases, ef, collection, text) if collection else asyncio.sleep(0)
+    return await asyncio.gather(image_task, search_task, return_exceptions=True)
+
 # ========== 분석 함수 ==========
 def analyze_article_streamlit(url: str, api_key: str, progress_container, status_container):
     """Streamlit용 기사 분석 함수"""
@@ -225,77 +444,67 @@ def analyze_article_streamlit(url: str, api_key: str, progress_container, status
     progress_bar.progress(10)
 
     try:
-        article = extract_article(url)
-        if not article or not article.get('text'):
-            status_container.error("❌ 기사 추출 실패: 유효한 기사를 찾을 수 없습니다.")
-            return None
-        status_container.success(f"✅ 기사 추출 완료: {article.get('title', '')[:50]}...")
+        article = cached_extract_article(url)
+        status_container.success(f"✅ 기사 추출 완료: {(article.get('title') or '')[:50]}...")
+    except ArticleNotFoundError as e:
+        status_container.error(f"❌ 기사 추출 실패: {e}")
+        return None
     except Exception as e:
         status_container.error(f"❌ 기사 추출 오류: {e}")
         return None
 
     progress_bar.progress(20)
 
-    # 2. 이미지 처리
-    status_container.info("🖼️ 2단계: 이미지 처리 중...")
-    image_desc = None
+    # 제목과 잘라낸 본문은 한 번만 만들어 검색·심의문·검토에 재사용
+    title = article.get('title') or ''
+    body = (article.get('text') or '')[:2000]
+    query_text = f"{title} {body}"
+
+    # 2~3. 이미지 처리 및 유사 사례 검색 (서로 독립적이므로 동시 실행)
+    status_container.info("🖼️ 2단계: 이미지 처리 및 🔎 3단계: 유사 사례 검색 중...")
     img_url = article.get('image_url')
 
+    # 캐시된 리소스는 스크립트 스레드에서 먼저 불러온 뒤 작업 스레드에 전달
+    load_error = None
+    try:
+        ef = load_embedding_model()
+        collection = load_chroma_collection()
+    except Exception as e:
+        ef = collection = None
+        load_error = e
     if img_url:
-        try:
-            resp = requests.get(img_url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-            img = Image.open(BytesIO(resp.content))
-            if img.mode == 'RGBA':
-                bg = Image.new('RGB', img.size, (255, 255, 255))
-                bg.paste(img, mask=img.split()[-1])
-                img = bg
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            buffer = BytesIO()
-            img.save(buffer, format='JPEG', quality=85)
-            b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-            image_desc = call_gemini(api_key, "이 이미지를 한국어로 상세히 설명해주세요.", image_data=b64, temperature=0.3)
-            status_container.success("✅ 이미지 설명 생성 완료")
-        except Exception as e:
-            status_container.warning(f"⚠️ 이미지 처리 실패: {e}")
-    else:
+        get_gemini_client(api_key)
+        get_http_session()
+
+    image_result, search_result = asyncio.run(
+        run_image_and_search(api_key, img_url, ef, collection, query_text)
+    )
+
+    image_desc = None
+    if not img_url:
         status_container.info("ℹ️ 이미지 없음")
+    elif isinstance(image_result, Exception):
+        status_container.warning(f"⚠️ 이미지 처리 실패: {image_result}")
+    else:
+        image_desc = image_result
+        status_container.success("✅ 이미지 설명 생성 완료")
 
     progress_bar.progress(40)
 
-    # 3. 유사 사례 검색
-    status_container.info("🔎 3단계: 유사 사례 검색 중...")
     similar_cases = ""
     violation_count = 0
     no_violation_count = 0
 
-    try:
-        ef = load_embedding_model()
-        collection = load_chroma_collection()
-
-        if collection:
-            text = f"{article.get('title', '')} {article.get('text', '')[:2000]}"
-            query_emb = ef([text])
-            results = collection.query(query_embeddings=query_emb, n_results=5)
-            cases = []
-            for i in range(len(results["documents"][0])):
-                reason = results['metadatas'][0][i]['reason']
-                cases.append(f"{i+1}. {reason}")
-
-                # 위반 개수 카운팅
-                if '위반' in reason and '위반 없음' not in reason and '위반없음' not in reason:
-                    violation_count += 1
-                elif '위반 없음' in reason or '위반없음' in reason:
-                    no_violation_count += 1
-
-            similar_cases = "\n".join(cases)
-            status_container.success(f"✅ 유사 사례 {len(cases)}개 검색 완료 (위반 {violation_count}/5, 위반없음 {no_violation_count}/5)")
-        else:
-            status_container.warning("⚠️ 유사 사례 검색 실패: ChromaDB 로드 오류")
-    except Exception as e:
-        status_container.warning(f"⚠️ 유사 사례 검색 실패: {e}")
+    if load_error:
+        status_container.warning(f"⚠️ 유사 사례 검색 실패: {load_error}")
+    elif not collection:
+        status_container.warning("⚠️ 유사 사례 검색 실패: ChromaDB 로드 오류")
+    elif isinstance(search_result, Exception):
+        status_container.warning(f"⚠️ 유사 사례 검색 실패: {search_result}")
+    else:
+        cases, violation_count, no_violation_count = search_result
+        similar_cases = "\n".join(cases)
+        status_container.success(f"✅ 유사 사례 {len(cases)}개 검색 완료 (위반 {violation_count}/5, 위반없음 {no_violation_count}/5)")
 
     progress_bar.progress(60)
 
@@ -303,7 +512,7 @@ def analyze_article_streamlit(url: str, api_key: str, progress_container, status
     status_container.info("📝 4단계: 심의문 생성 중...")
 
     try:
-        prompt = f"{REGULATION}\n\n{INST_PROMPT}\n\n#기사:\n{article.get('title', '')} {article.get('text', '')[:2000]}"
+        prompt = DECIDE_PREFIX + query_text
         if image_desc:
             prompt += f"\n\n#이미지:\n{image_desc}"
         if similar_cases:
@@ -312,7 +521,9 @@ def analyze_article_streamlit(url: str, api_key: str, progress_container, status
             if no_violation_count >= 4:
                 prompt += f"\n\n**중요**: 유사 사례 5개 중 {no_violation_count}개가 '위반 없음'입니다. 4개 이상이므로 이 기사도 '위반 없음'을 강력하게 고려하십시오."
 
-        decision = call_gemini(api_key, prompt, temperature=0.0)
+        decision = write_stream_temporarily(
+            status_container, call_gemini_stream(api_key, prompt, temperature=0.0)
+        )
         status_container.success("✅ 심의문 생성 완료")
     except Exception as e:
         status_container.error(f"❌ 심의문 생성 실패: {e}")
@@ -331,8 +542,8 @@ def analyze_article_streamlit(url: str, api_key: str, progress_container, status
             review_prompt = f"""당신은 신문윤리위원회 검토 담당자입니다. 생성된 심의문을 검토하고 수정하세요.
 
 #분석 대상 기사:
-제목: {article.get('title', '')}
-본문: {article.get('text', '')[:2000]}
+제목: {title}
+본문: {body}
 
 #생성된 심의문:
 {decision}
@@ -352,7 +563,9 @@ def analyze_article_streamlit(url: str, api_key: str, progress_container, status
 
 수정된 최종 심의문만 출력하시오 (검토 의견 절대 포함 금지):"""
 
-            final_decision = call_gemini(api_key, review_prompt, temperature=0.0)
+            final_decision = write_stream_temporarily(
+                status_container, call_gemini_stream(api_key, review_prompt, temperature=0.0)
+            )
             final_decision = correct_article_reference(final_decision.strip())
             status_container.success("✅ 검토 완료: 조항 정확성 및 기사 관련성 검증 완료")
         except Exception as e:
@@ -428,7 +641,8 @@ if analyze_button:
                         st.warning("이미지를 불러올 수 없습니다.")
 
                 with st.expander("📄 기사 본문", expanded=False):
-                    st.write(article.get('text', 'N/A')[:1000] + "..." if len(article.get('text', '')) > 1000 else article.get('text', 'N/A'))
+                    article_text = article.get('text') or 'N/A'
+                    st.write(article_text[:1000] + "..." if len(article_text) > 1000 else article_text)
 
             with col2:
                 st.subheader("📈 분석 정보")
@@ -11,24 +11,28 @@
         'image_url': '대표 이미지 URL'
     }
 
-의존성: pip3 install trafilatura newspaper3k playwright beautifulsoup4 requests fake-useragent extruct
+의존성: pip3 install trafilatura newspaper3k playwright lxml requests fake-useragent extruct
 Playwright 초기 설치: playwright install chromium
 
 성능 최적 순서:
 1. Trafilatura (가장 빠르고 정확, 정적 콘텐츠)
 2. Newspaper3k (빠르고 한국어 지원 우수)
-3. Playwright + Trafilatura (JavaScript 렌더링 필요시)
+3. Playwright + Trafilatura (본문 추출 실패시, JavaScript 렌더링)
 4. Playwright + Newspaper3k (대체 방법)
+
+정적 HTML과 렌더링된 HTML은 각각 한 번만 가져와 추출기들이 공유
 """
 
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict
 from urllib.parse import urljoin
 
 import requests
 import trafilatura
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
 from newspaper import Article
 
 try:
@@ -46,7 +50,7 @@ except ImportError:
     print("⚠️  Playwright 미설치 - JavaScript 렌더링 기능 비활성화")
 
 try:
-    import extruct
+    from extruct.jsonld import JsonLdExtractor
     EXTRUCT_AVAILABLE = True
 except ImportError:
     EXTRUCT_AVAILABLE = False
@@ -62,32 +66,47 @@ HEADERS = {
     'Upgrade-Insecure-Requests': '1',
 }
 
+# HTTP 세션 (keep-alive 연결 재사용)
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_http_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3,
+                      status_forcelist=[502, 503, 504], raise_on_status=False)
+)
+SESSION.mount("https://", _http_adapter)
+SESSION.mount("http://", _http_adapter)
+
 def fetch_with_headers(url: str) -> str:
     """HTTP 헤더를 포함한 URL 요청"""
-    response = requests.get(url, headers=HEADERS, timeout=30)
+    response = SESSION.get(url, timeout=30)
     response.raise_for_status()
     return response.text
 
 def extract_images_from_html(html: str, base_url: str = "") -> Optional[str]:
     """HTML에서 이미지 추출 (여러 방법 시도)"""
-    soup = BeautifulSoup(html, 'html.parser')
+    try:
+        tree = lxml_html.document_fromstring(
+            html.encode('utf-8'), parser=lxml_html.HTMLParser(encoding='utf-8'))
+    except (ValueError, etree.ParserError):
+        return None
 
     # 1. og:image 메타태그
-    og_image = soup.find('meta', property='og:image')
-    if og_image and og_image.get('content'):
-        return og_image.get('content')
+    og_image = tree.xpath('//meta[@property="og:image"]')
+    if og_image and og_image[0].get('content'):
+        return og_image[0].get('content')
 
     # 2. twitter:image
-    tw_image = soup.find('meta', attrs={'name': 'twitter:image'})
-    if tw_image and tw_image.get('content'):
-        return tw_image.get('content')
+    tw_image = tree.xpath('//meta[@name="twitter:image"]')
+    if tw_image and tw_image[0].get('content'):
+        return tw_image[0].get('content')
 
-    # 3. extruct로 JSON-LD 파싱
+    # 3. extruct로 JSON-LD 파싱 (이미 파싱한 트리 재사용, 다른 문법은 파싱하지 않음)
     if EXTRUCT_AVAILABLE:
         try:
-            metadata = extruct.extract(html, base_url=base_url)
             # Schema.org ImageObject 찾기
-            for item in metadata.get('json-ld', []):
+            for item in JsonLdExtractor().extract_items(tree, base_url=base_url):
                 if isinstance(item, dict):
                     if item.get('image'):
                         img = item['image']
@@ -97,17 +116,22 @@ def extract_images_from_html(html: str, base_url: str = "") -> Optional[str]:
                             return img['url']
                         elif isinstance(img, list) and len(img) > 0:
                             return img[0] if isinstance(img[0], str) else img[0].get('url')
-        except:
+        except (ValueError, AttributeError):
+            # 잘못된 JSON-LD 또는 예상과 다른 구조
             pass
 
-    # 4. article 내부의 첫 번째 이미지
-    article_imgs = soup.select('article img[src], .article img[src], #article img[src]')
+    # 4. article 내부의 첫 번째 이미지 (article, .article, #article)
+    article_imgs = tree.xpath(
+        '//article//img[@src]'
+        ' | //*[contains(concat(" ", normalize-space(@class), " "), " article ")]//img[@src]'
+        ' | //*[@id="article"]//img[@src]'
+    )
     if article_imgs:
         src = article_imgs[0].get('src')
         return urljoin(base_url, src) if src else None
 
     # 5. 일반 img 태그
-    imgs = soup.find_all('img', src=True)
+    imgs = tree.xpath('//img[@src]')
     for img in imgs:
         src = img.get('src')
         # 로고, 아이콘 제외
@@ -123,104 +147,145 @@ def extract_images_from_html(html: str, base_url: str = "") -> Optional[str]:
 
     return None
 
-def extract_trafilatura(url: str) -> Optional[Dict[str, str]]:
-    """Trafilatura 기사 추출"""
+def extract_trafilatura(html: str, url: str) -> Optional[Dict[str, str]]:
+    """Trafilatura 기사 추출 (미리 가져온 HTML 사용)"""
     try:
-        html = fetch_with_headers(url)
         result = trafilatura.extract(html, output_format='json', url=url,
                                     include_images=True, include_links=True)
         if result:
             data = json.loads(result)
-            image_url = data.get('image') or extract_images_from_html(html, url)
 
             return {
                 'title': data.get('title'),
                 'text': data.get('text'),
-                'image_url': image_url
+                'image_url': data.get('image')
             }
     except Exception as e:
         print(f"Trafilatura 실패: {e}")
     return None
 
-def extract_newspaper(url: str) -> Optional[Dict[str, str]]:
-    """Newspaper3k 기사 추출"""
+def extract_newspaper(html: str, url: str) -> Optional[Dict[str, str]]:
+    """Newspaper3k 기사 추출 (미리 가져온 HTML 사용)"""
     try:
-        html = fetch_with_headers(url)
         article = Article(url)
         article.config.browser_user_agent = HEADERS['User-Agent']
         article.set_html(html)
         article.parse()
 
-        image_url = article.top_image or extract_images_from_html(html, url)
-
         return {
             'title': article.title,
             'text': article.text,
-            'image_url': image_url
+            'image_url': article.top_image
         }
     except Exception as e:
         print(f"Newspaper3k 실패: {e}")
     return None
 
-def get_rendered_html_playwright(url: str, wait: int = 2) -> Optional[str]:
+# ========== Playwright 브라우저 (재사용) ==========
+# sync Playwright 객체는 생성한 스레드에서만 쓸 수 있으므로 전용 스레드 1개가 브라우저를 소유
+# (프로세스가 종료되면 Playwright 드라이버가 브라우저도 함께 종료)
+_playwright_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playwright")
+_playwright = None
+_browser = None
+_browser_context = None
+# 본문 추출에 쓰이지 않는 리소스는 요청하지 않음 (이미지 URL은 HTML 속성에 그대로 남음)
+_BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+def _block_heavy_resources(route):
+    """이미지, 미디어, 폰트 요청 차단"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+def _get_browser_context():
+    """브라우저 컨텍스트를 최초 1회 생성 (전용 스레드에서만 호출)"""
+    global _playwright, _browser, _browser_context
+    if _browser is not None and not _browser.is_connected():
+        # 브라우저 프로세스가 죽었으면 다시 띄움
+        _browser = _browser_context = None
+    if _browser_context is None:
+        if _playwright is None:
+            _playwright = sync_playwright().start()
+        _browser = _playwright.chromium.launch(headless=True)
+        _browser_context = _browser.new_context(
+            user_agent=HEADERS['User-Agent'],
+            viewport={'width': 1920, 'height': 1080}
+        )
+        _browser_context.route('**/*', _block_heavy_resources)
+    return _browser_context
+
+def _render_page(url: str, wait: float) -> str:
+    """공유 컨텍스트에서 페이지 하나만 열어 렌더링 (전용 스레드에서만 호출)"""
+    page = _get_browser_context().new_page()
+    try:
+        page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        # 고정 대기 대신 네트워크가 잠잠해질 때까지 대기 (최대 wait초, 초과 시 현재 상태 사용)
+        try:
+            page.wait_for_load_state('networkidle', timeout=wait * 1000)
+        except PlaywrightTimeout:
+            pass
+        return page.content()
+    finally:
+        page.close()
+
+def get_rendered_html_playwright(url: str, wait: float = 5) -> Optional[str]:
     """Playwright로 렌더링된 HTML 가져오기"""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent=HEADERS['User-Agent'],
-                viewport={'width': 1920, 'height': 1080}
-            )
-            page = context.new_page()
-            page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            time.sleep(wait)
-            html = page.content()
-            browser.close()
-            return html
+        return _playwright_executor.submit(_render_page, url, wait).result()
     except Exception as e:
         print(f"Playwright 오류: {e}")
         return None
 
-def extract_playwright_trafilatura(url: str) -> Optional[Dict[str, str]]:
-    """Playwright + Trafilatura 조합"""
-    try:
-        html = get_rendered_html_playwright(url)
-        if html:
-            result = trafilatura.extract(html, output_format='json', url=url,
-                                        include_images=True, include_links=True)
-            if result:
-                data = json.loads(result)
-                image_url = data.get('image') or extract_images_from_html(html, url)
-
-                return {
-                    'title': data.get('title'),
-                    'text': data.get('text'),
-                    'image_url': image_url
-                }
-    except Exception as e:
-        print(f"Playwright+Trafilatura 실패: {e}")
-    return None
-
-def extract_playwright_newspaper(url: str) -> Optional[Dict[str, str]]:
-    """Playwright + Newspaper3k 조합"""
-    try:
-        html = get_rendered_html_playwright(url)
-        if html:
-            article = Article(url='')
-            article.set_html(html)
-            article.parse()
-
-            image_url = article.top_image or extract_images_from_html(html, url)
-
-            return {
-                'title': article.title,
-                'text': article.text,
-                'image_url': image_url
-            }
-    except Exception as e:
-        print(f"Playwright+Newspaper3k 실패: {e}")
-    return None
-
+# 같은 HTML을 공유하는 추출기 (빠르고 정확한 것부터)
+EXTRACTORS = [
+    ("Trafilatura", extract_trafilatura),
+    ("Newspaper3k", extract_newspaper),
+]
+
+def _run_extractors(html: str, url: str, result: Dict[str, Optional[str]],
+                    prefix: str = "", step: int = 1) -> int:
+    """하나의 HTML로 추출기를 차례로 실행하여 result를 채움 (다음 단계 번호 반환)"""
+    for name, extractor in EXTRACTORS:
+        # 제목과 본문이 이미 있으면 나머지 추출기(Newspaper3k 재파싱) 생략
+        # (제목이 없으면 Newspaper3k가 제목 대체 수단이므로 계속 실행)
+        if result['title'] and result['text']:
+            break
+
+        name = f"{prefix}{name}"
+        print(f"   {step}️⃣ {name} 시도...")
+        step += 1
+
+        data = extractor(html, url)
+        if not data:
+            print(f"   ❌ {name} 실패")
+            continue
+
+        # 결과 업데이트
+        updated = []
+        for key in result:
+            if not result[key] and data.get(key):
+                result[key] = data[key]
+                updated.append(key)
+
+        if updated:
+            print(f"      → 추출 성공: {', '.join(updated)}")
+
+        # 상태 출력
+        status = f"제목: {'O' if result['title'] else 'X'}, 본문: {'O' if result['text'] else 'X'}, 이미지: {'O' if result['image_url'] else 'X'}"
+        if result['title'] and result['text'] and result['image_url']:
+            print(f"   ✅ {name} 완료! (제목 O, 본문 O, 이미지 O)")
+        elif result['title'] and result['text']:
+            print(f"   ⚠️ 이미지 없음 ({status})")
+        else:
+            print(f"   ⚠️ 부분 성공 ({status})")
+
+    # 추출기가 이미지를 못 찾은 경우에만 같은 HTML에서 한 번 탐색
+    if not result['image_url']:
+        result['image_url'] = extract_images_from_html(html, url)
+        if result['image_url']:
+            print("      → HTML에서 이미지 추출 성공")
+    return step
 
 def extract_article(url: str) -> Optional[Dict[str, str]]:
     """기사 추출 - 최적 순서로 시도"""
@@ -228,58 +293,19 @@ def extract_article(url: str) -> Optional[Dict[str, str]]:
 
     result = {'title': None, 'text': None, 'image_url': None}
 
-    # 최적 순서: 빠르고 정확한 것부터 시도
-    # 1. Trafilatura - 가장 빠르고 정확 (정적 콘텐츠)
-    # 2. Newspaper3k - 빠르고 한국어 지원 우수
-    # 3. Playwright + Trafilatura - JavaScript 렌더링이 필요한 경우
-    # 4. Playwright + Newspaper3k - 대체 방법
-    extractors = [
-        ("Trafilatura", extract_trafilatura),
-        ("Newspaper3k", extract_newspaper),
-    ]
-
-    # Playwright 추가 (JavaScript 렌더링 필요시)
-    if PLAYWRIGHT_AVAILABLE:
-        extractors.extend([
-            ("Playwright+Trafilatura", extract_playwright_trafilatura),
-            ("Playwright+Newspaper3k", extract_playwright_newspaper),
-        ])
-
-    for i, (name, extractor) in enumerate(extractors, 1):
-        print(f"   {i}️⃣ {name} 시도...")
-        try:
-            data = extractor(url)
-            if data:
-                # 결과 업데이트
-                updated = []
-                for key in result:
-                    if not result[key] and data.get(key):
-                        result[key] = data[key]
-                        updated.append(key)
-
-                if updated:
-                    print(f"      → 추출 성공: {', '.join(updated)}")
-
-                # 제목, 본문, 이미지 모두 있으면 성공
-                if result['title'] and result['text'] and result['image_url']:
-                    print(f"   ✅ {name} 완료! (제목 O, 본문 O, 이미지 O)")
-                    return result
-
-                # 상태 출력
-                status = f"제목: {'O' if result['title'] else 'X'}, 본문: {'O' if result['text'] else 'X'}, 이미지: {'O' if result['image_url'] else 'X'}"
-                if result['title'] and result['text']:
-                    print(f"   ⚠️ 이미지 없음 - 다음 단계 계속 ({status})")
-                else:
-                    print(f"   ⚠️ 부분 성공 ({status})")
-            else:
-                print(f"   ❌ {name} 실패")
-        except requests.HTTPError as e:
-            if e.response.status_code in (403, 429):
-                print(f"   ❌ {name} 차단됨 (HTTP {e.response.status_code})")
-                raise
-            print(f"   ❌ {name} 오류: {e}")
-        except Exception as e:
-            print(f"   ❌ {name} 오류: {e}")
+    # 1~2. 정적 HTML은 한 번만 요청하여 Trafilatura, Newspaper3k가 공유
+    step = 1
+    try:
+        html = fetch_with_headers(url)
+        step = _run_extractors(html, url, result, step=step)
+    except requests.RequestException as e:
+        print(f"   ❌ HTML 요청 실패: {e}")
+
+    # 3~4. 본문이 없을 때만 Playwright로 한 번 렌더링 (JavaScript 렌더링 필요시)
+    if not result['text'] and PLAYWRIGHT_AVAILABLE:
+        rendered_html = get_rendered_html_playwright(url)
+        if rendered_html:
+            _run_extractors(rendered_html, url, result, prefix="Playwright+", step=step)
 
     if result['title'] or result['text']:
         print(f"   ✅ 최종 결과 - 제목: {'O' if result['title'] else 'X'}, 본문: {'O' if result['text'] else 'X'}, 이미지: {'O' if result['image_url'] else 'X'}")